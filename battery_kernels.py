@@ -0,0 +1,66 @@
+"""Numba kernels for the battery simulator.
+
+Kept out of the Streamlit script so they are compiled (or loaded from Numba's
+on-disk cache) once per server process instead of on every script rerun.
+"""
+import numpy as np
+from numba import njit, types
+
+
+# The explicit signature compiles at import rather than stalling the first simulation tick
+@njit("Tuple((f4[:], f4[:], f4[:], f4[:]))(f4[:], f4[:], f4[:], f4[:], f4[:], f4[:, :])",
+      cache=True, fastmath=True)
+def step_cells(voltage, current, temp, min_voltage, max_voltage, noise):
+    """Apply one tick of variation (noise rows: voltage, current, temp) in place and derive capacity"""
+    np.add(voltage, noise[0], voltage)
+    np.add(current, noise[1], current)
+    np.add(temp, noise[2], temp)
+    np.clip(voltage, min_voltage, max_voltage, out=voltage)
+    np.clip(current, 0.0, np.inf, out=current)
+    np.clip(temp, 20.0, 50.0, out=temp)
+    return voltage, current, temp, voltage * current
+
+
+# Inputs are typed read-only so pandas' copy-on-write column views are accepted as-is
+@njit(types.int64[:](types.Array(types.int64, 1, "A", readonly=True),
+                     types.Array(types.float32, 1, "A", readonly=True),
+                     types.int64),
+      cache=True)
+def lttb(x, y, n_out):
+    """Select n_out indices of (x, y) with Largest-Triangle-Three-Buckets downsampling"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Interior points 1..n-2 are split into n_out - 2 buckets; the end points are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, np.int64)
+    indices[0] = 0
+    indices[n_out - 1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+
+        # Average of the next bucket is the third triangle vertex
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(end, next_end):
+            avg_x += x[j] - x[0]
+            avg_y += y[j]
+        avg_x /= next_end - end
+        avg_y /= next_end - end
+
+        ax = float(x[a] - x[0])
+        ay = float(y[a])
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - (x[j] - x[0])) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        a = best
+        indices[i + 1] = a
+    return indices
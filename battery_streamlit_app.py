@@ -1,13 +1,13 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import random
-import time
 import io
+import uuid
 from datetime import datetime, timedelta
 import numpy as np
+from battery_kernels import lttb, step_cells
 
 # Page configuration
 st.set_page_config(
@@ -17,8 +17,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for modern styling
-st.markdown("""
+# Custom CSS for modern styling. It must be re-sent on every full rerun for the styles
+# to persist, so whitespace is collapsed to keep that payload small; live-update ticks
+# run in a fragment and skip it entirely.
+CUSTOM_CSS = " ".join("""
 <style>
     .main-header {
         background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
@@ -59,18 +61,82 @@ st.markdown("""
         border-radius: 10px;
     }
 </style>
-""", unsafe_allow_html=True)
+""".split())
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+# Nominal, minimum and maximum voltage per cell chemistry
+CELL_SPECS = {
+    "lfp": (3.2, 2.8, 3.6),
+    "nmc": (3.6, 3.2, 4.0)
+}
+
+# Numeric per-cell fields, stored as parallel float32 NumPy arrays
+CELL_NUMERIC_FIELDS = ["voltage", "current", "temp", "capacity", "min_voltage", "max_voltage"]
+
+# Display formats for numeric values; stored values keep full precision
+VALUE_FORMATS = {
+    "voltage": "%.2f",
+    "current": "%.2f",
+    "temp": "%.1f",
+    "capacity": "%.2f",
+    "min_voltage": "%.1f",
+    "max_voltage": "%.1f"
+}
+
+def value_column_config(labels=None):
+    """Column config that rounds numeric cell and history values for display only"""
+    labels = labels or {}
+    return {
+        field: st.column_config.NumberColumn(labels.get(field), format=fmt)
+        for field, fmt in VALUE_FORMATS.items()
+    }
+
+def empty_cells_soa():
+    """Create an empty structure-of-arrays store for cell state"""
+    soa = {"cell_id": [], "type": []}
+    for field in CELL_NUMERIC_FIELDS:
+        soa[field] = np.empty(0, np.float32)
+    return soa
+
+# Per-record history fields, stored as parallel float32 columns
+HISTORY_FIELDS = ["voltage", "current", "temp", "capacity"]
+HISTORY_INITIAL_CAPACITY = 4096
+# Once this many records are held, the oldest are overwritten. That is ~2.8 MB of columns,
+# and each chart rebuild scans the full history: at 100k records it adds ~5 ms to a tick
+# whose ~35 ms (20 cells) is mostly fixed Plotly trace construction
+MAX_HISTORY_RECORDS = 100_000
+# Upper bound on points sent to the browser per chart
+MAX_CHART_POINTS = 2000
+
+def empty_history(capacity=HISTORY_INITIAL_CAPACITY):
+    """Create an empty preallocated columnar buffer for historical records"""
+    history = {
+        "id": uuid.uuid4().hex,
+        "size": 0,
+        "head": 0,
+        "timestamp": np.empty(capacity, "datetime64[ns]"),
+        "cell": np.empty(capacity, "i4")
+    }
+    for field in HISTORY_FIELDS:
+        history[field] = np.empty(capacity, "f4")
+    return history
 
 # Initialize session state
 def initialize_session_state():
-    if 'cells_data' not in st.session_state:
-        st.session_state.cells_data = {}
+    if 'cells_soa' not in st.session_state:
+        st.session_state.cells_soa = empty_cells_soa()
     if 'tasks_data' not in st.session_state:
         st.session_state.tasks_data = {}
     if 'simulation_running' not in st.session_state:
         st.session_state.simulation_running = False
     if 'historical_data' not in st.session_state:
-        st.session_state.historical_data = []
+        st.session_state.historical_data = empty_history()
+    if 'rng' not in st.session_state:
+        st.session_state.rng = np.random.default_rng()
+    if 'sim_version' not in st.session_state:
+        st.session_state.sim_version = 0
+    if 'history_figs' not in st.session_state:
+        st.session_state.history_figs = (None, {})
     if 'current_time' not in st.session_state:
         st.session_state.current_time = 0
 
@@ -84,61 +150,178 @@ page = st.sidebar.selectbox(
 )
 
 # Helper functions
-def generate_cell_data(cell_type, cell_id):
-    """Generate initial cell data based on type"""
-    voltage = 3.2 if cell_type.lower() == "lfp" else 3.6
-    min_voltage = 2.8 if cell_type.lower() == "lfp" else 3.2
-    max_voltage = 3.6 if cell_type.lower() == "lfp" else 4.0
-    current = round(random.uniform(0.1, 2.0), 2)
-    temp = round(random.uniform(25, 40), 1)
-    capacity = round(voltage * current, 2)
+def add_cells(cell_type, count):
+    """Generate a batch of cells of one type and append them to the cell arrays"""
+    soa = st.session_state.cells_soa
+    rng = st.session_state.rng
+    start_id = len(soa["cell_id"]) + 1
+    voltage, min_voltage, max_voltage = CELL_SPECS[cell_type]
+    current = np.round(rng.uniform(0.1, 2.0, count), 2)
     
-    return {
-        "cell_id": f"cell_{cell_id}_{cell_type}",
-        "type": cell_type,
-        "voltage": voltage,
+    new_cells = {
+        "voltage": np.full(count, voltage),
         "current": current,
-        "temp": temp,
-        "capacity": capacity,
-        "min_voltage": min_voltage,
-        "max_voltage": max_voltage,
-        "status": "Active"
+        "temp": np.round(rng.uniform(25, 40, count), 1),
+        "capacity": np.round(voltage * current, 2),
+        "min_voltage": np.full(count, min_voltage),
+        "max_voltage": np.full(count, max_voltage)
     }
+    soa["cell_id"] = soa["cell_id"] + [f"cell_{start_id + i}_{cell_type}" for i in range(count)]
+    soa["type"] = soa["type"] + [cell_type] * count
+    for field in CELL_NUMERIC_FIELDS:
+        soa[field] = np.concatenate([soa[field], new_cells[field].astype(np.float32)])
+
+def get_cells_df():
+    """Build an id-indexed DataFrame directly from the cell arrays"""
+    soa = st.session_state.cells_soa
+    return pd.DataFrame(
+        {
+            "cell_id": soa["cell_id"],
+            "type": soa["type"],
+            **{field: soa[field] for field in CELL_NUMERIC_FIELDS},
+            "status": "Active"
+        },
+        index=soa["cell_id"]
+    )
+
+def append_history(timestamp):
+    """Append one record per cell to the history ring buffer, evicting the oldest when full"""
+    history = st.session_state.historical_data
+    soa = st.session_state.cells_soa
+    n = len(soa["cell_id"])
+    size = history["size"]
+    
+    # Grow until the record cap is reached; the buffer never wraps before then
+    capacity = len(history["cell"])
+    if size + n > capacity and capacity < MAX_HISTORY_RECORDS:
+        capacity = min(max(2 * capacity, size + n), MAX_HISTORY_RECORDS)
+        for key, column in history.items():
+            if isinstance(column, np.ndarray):
+                grown = np.empty(capacity, column.dtype)
+                grown[:size] = column[:size]
+                history[key] = grown
+        history["head"] = size
+    
+    positions = (history["head"] + np.arange(n)) % capacity
+    history["timestamp"][positions] = np.datetime64(timestamp, "ns")
+    history["cell"][positions] = np.arange(n)
+    for field in HISTORY_FIELDS:
+        history[field][positions] = soa[field]
+    history["head"] = (history["head"] + n) % capacity
+    history["size"] = min(size + n, capacity)
+
+def get_history_df():
+    """Build a DataFrame over the filled range of the history buffer, oldest record first"""
+    history = st.session_state.historical_data
+    size, head = history["size"], history["head"]
+    
+    def ordered(column):
+        if size < len(column):
+            return column[:size]
+        return np.concatenate((column[head:], column[:head]))
+    
+    return pd.DataFrame({
+        "timestamp": ordered(history["timestamp"]),
+        "cell_id": pd.Categorical.from_codes(
+            ordered(history["cell"]), categories=st.session_state.cells_soa["cell_id"]
+        ),
+        **{field: ordered(history[field]) for field in HISTORY_FIELDS}
+    })
+
+def downsample_history(df_hist, field, max_points=MAX_CHART_POINTS):
+    """Downsample each cell's series of a history field so a chart holds at most max_points.
+    
+    Returns a list of (cell_id, timestamps, values) tuples in cell order.
+    """
+    cell_ids = df_hist["cell_id"].cat.categories
+    codes = df_hist["cell_id"].cat.codes.to_numpy()
+    # A stable sort keeps each cell's records in time order
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(cell_ids) + 1))
+    present = [code for code in range(len(cell_ids)) if bounds[code + 1] > bounds[code]]
+    points_per_cell = max(max_points // max(len(present), 1), 3)
+    
+    timestamps = df_hist["timestamp"].to_numpy()
+    values = df_hist[field].to_numpy()
+    series = []
+    for code in present:
+        rows = order[bounds[code]:bounds[code + 1]]
+        cell_timestamps, cell_values = timestamps[rows], values[rows]
+        keep = lttb(cell_timestamps.view("i8"), cell_values, points_per_cell)
+        series.append((cell_ids[code], cell_timestamps[keep], cell_values[keep]))
+    return series
+
+def build_history_fig(df_hist, field, title, labels=None):
+    """Build a per-cell WebGL line chart of a history field"""
+    labels = labels or {}
+    fig = go.Figure([
+        go.Scattergl(x=timestamps, y=values, mode="lines", name=cell_id)
+        for cell_id, timestamps, values in downsample_history(df_hist, field)
+    ])
+    fig.update_layout(
+        title=title,
+        xaxis_title=labels.get('timestamp', 'timestamp'),
+        yaxis_title=labels.get(field, field),
+        legend_title_text="cell_id"
+    )
+    return fig
+
+def get_history_figs():
+    """Return this session's history charts, rebuilt only after the history changes"""
+    key = (st.session_state.historical_data["id"], st.session_state.sim_version)
+    cached_key, figs = st.session_state.history_figs
+    if cached_key != key:
+        df_hist = get_history_df()
+        figs = {
+            "voltage": build_history_fig(
+                df_hist,
+                'voltage',
+                "📊 Cell Voltage Over Time",
+                labels={'voltage': 'Voltage (V)', 'timestamp': 'Time'}
+            ),
+            "temp": build_history_fig(df_hist, 'temp', "🌡️ Temperature Monitoring"),
+            "current": build_history_fig(df_hist, 'current', "⚡ Current Flow")
+        }
+        figs["voltage"].update_layout(height=400)
+        st.session_state.history_figs = (key, figs)
+    return figs
+
+@st.cache_data(max_entries=8)
+def to_csv_bytes(df, index=True):
+    """Serialize a DataFrame to CSV bytes, recomputed only when the data changes"""
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=index)
+    return buffer.getvalue()
+
+@st.cache_data(max_entries=2)
+def to_parquet_bytes(df):
+    """Serialize a DataFrame to zstd-compressed Parquet bytes"""
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False, compression="zstd")
+    return buffer.getvalue()
 
 def simulate_real_time_data():
     """Simulate real-time changes in cell data"""
-    if st.session_state.cells_data:
-        for cell_id, cell_data in st.session_state.cells_data.items():
-            # Add small random variations
-            voltage_change = random.uniform(-0.05, 0.05)
-            temp_change = random.uniform(-1, 1)
-            current_change = random.uniform(-0.1, 0.1)
-            
-            # Update with constraints
-            new_voltage = max(cell_data["min_voltage"], 
-                            min(cell_data["max_voltage"], 
-                                cell_data["voltage"] + voltage_change))
-            new_temp = max(20, min(50, cell_data["temp"] + temp_change))
-            new_current = max(0, cell_data["current"] + current_change)
-            
-            st.session_state.cells_data[cell_id]["voltage"] = round(new_voltage, 2)
-            st.session_state.cells_data[cell_id]["temp"] = round(new_temp, 1)
-            st.session_state.cells_data[cell_id]["current"] = round(new_current, 2)
-            st.session_state.cells_data[cell_id]["capacity"] = round(new_voltage * new_current, 2)
+    soa = st.session_state.cells_soa
+    n = len(soa["cell_id"])
+    if n:
+        # Add small random variations, drawn for all cells in one call
+        noise = st.session_state.rng.uniform(
+            low=[[-0.05], [-0.1], [-1]], high=[[0.05], [0.1], [1]], size=(3, n)
+        ).astype(np.float32)
+        
+        # Update with constraints
+        soa["voltage"], soa["current"], soa["temp"], soa["capacity"] = step_cells(
+            soa["voltage"], soa["current"], soa["temp"],
+            soa["min_voltage"], soa["max_voltage"], noise
+        )
         
         # Store historical data
         timestamp = datetime.now() + timedelta(seconds=st.session_state.current_time)
-        for cell_id, cell_data in st.session_state.cells_data.items():
-            st.session_state.historical_data.append({
-                "timestamp": timestamp,
-                "cell_id": cell_id,
-                "voltage": cell_data["voltage"],
-                "current": cell_data["current"],
-                "temp": cell_data["temp"],
-                "capacity": cell_data["capacity"]
-            })
+        append_history(timestamp)
         
         st.session_state.current_time += 1
+        st.session_state.sim_version += 1
 
 # Page 1: Home
 if page == "🏠 Home":
@@ -170,10 +353,10 @@ if page == "🏠 Home":
         st.markdown("""
         ### 📊 Quick Stats
         """)
-        if st.session_state.cells_data:
-            st.metric("Active Cells", len(st.session_state.cells_data))
+        if st.session_state.cells_soa["cell_id"]:
+            st.metric("Active Cells", len(st.session_state.cells_soa["cell_id"]))
             st.metric("Active Tasks", len(st.session_state.tasks_data))
-            avg_voltage = np.mean([cell["voltage"] for cell in st.session_state.cells_data.values()])
+            avg_voltage = np.mean(st.session_state.cells_soa["voltage"])
             st.metric("Avg Voltage", f"{avg_voltage:.2f}V")
         else:
             st.info("No cells configured yet. Go to Setup Cells to get started!")
@@ -194,10 +377,7 @@ elif page == "⚡ Setup Cells":
             submitted = st.form_submit_button("Add Cells", use_container_width=True)
             
             if submitted:
-                start_id = len(st.session_state.cells_data) + 1
-                for i in range(cell_count):
-                    cell_id = f"cell_{start_id + i}_{cell_type.lower()}"
-                    st.session_state.cells_data[cell_id] = generate_cell_data(cell_type.lower(), start_id + i)
+                add_cells(cell_type.lower(), cell_count)
                 
                 st.success(f"Added {cell_count} {cell_type} cell(s)!")
                 st.rerun()
@@ -205,22 +385,22 @@ elif page == "⚡ Setup Cells":
     with col2:
         st.subheader("Current Cells Configuration")
         
-        if st.session_state.cells_data:
+        if st.session_state.cells_soa["cell_id"]:
             # Create DataFrame for display
-            df = pd.DataFrame.from_dict(st.session_state.cells_data, orient='index')
+            df = get_cells_df()
             
             # Display interactive table
             st.dataframe(
                 df,
                 use_container_width=True,
-                column_config={
-                    "voltage": st.column_config.NumberColumn("Voltage (V)", format="%.2f"),
-                    "current": st.column_config.NumberColumn("Current (A)", format="%.2f"),
-                    "temp": st.column_config.NumberColumn("Temperature (°C)", format="%.1f"),
-                    "capacity": st.column_config.NumberColumn("Capacity (Wh)", format="%.2f"),
-                    "min_voltage": st.column_config.NumberColumn("Min V", format="%.1f"),
-                    "max_voltage": st.column_config.NumberColumn("Max V", format="%.1f"),
-                }
+                column_config=value_column_config(labels={
+                    "voltage": "Voltage (V)",
+                    "current": "Current (A)",
+                    "temp": "Temperature (°C)",
+                    "capacity": "Capacity (Wh)",
+                    "min_voltage": "Min V",
+                    "max_voltage": "Max V"
+                })
             )
             
             # Cell management
@@ -234,8 +414,8 @@ elif page == "⚡ Setup Cells":
             
             with col4:
                 if st.button("🗑️ Clear All Cells", use_container_width=True):
-                    st.session_state.cells_data = {}
-                    st.session_state.historical_data = []
+                    st.session_state.cells_soa = empty_cells_soa()
+                    st.session_state.historical_data = empty_history()
                     st.success("All cells cleared!")
                     st.rerun()
         else:
@@ -304,22 +484,22 @@ elif page == "📋 Add Tasks":
         st.subheader("Current Tasks")
         
         if st.session_state.tasks_data:
-            for task_id, task_data in st.session_state.tasks_data.items():
-                with st.expander(f"{task_id}: {task_data['task_type']}", expanded=True):
-                    col3, col4, col5 = st.columns([2, 1, 1])
-                    
-                    with col3:
-                        st.json(task_data)
-                    
-                    with col4:
-                        if st.button(f"▶️ Start", key=f"start_{task_id}"):
-                            st.session_state.tasks_data[task_id]["status"] = "Running"
-                            st.rerun()
-                    
-                    with col5:
-                        if st.button(f"🗑️ Delete", key=f"delete_{task_id}"):
-                            del st.session_state.tasks_data[task_id]
-                            st.rerun()
+            df_tasks = pd.DataFrame.from_dict(st.session_state.tasks_data, orient='index')
+            st.dataframe(df_tasks, use_container_width=True)
+            
+            # Task actions apply to the selected task
+            task_id = st.selectbox("Select Task", list(st.session_state.tasks_data))
+            col3, col4 = st.columns(2)
+            
+            with col3:
+                if st.button("▶️ Start", use_container_width=True):
+                    st.session_state.tasks_data[task_id]["status"] = "Running"
+                    st.rerun()
+            
+            with col4:
+                if st.button("🗑️ Delete", use_container_width=True):
+                    del st.session_state.tasks_data[task_id]
+                    st.rerun()
         else:
             st.info("No tasks added yet. Create your first task!")
 
@@ -327,7 +507,7 @@ elif page == "📋 Add Tasks":
 elif page == "📊 Real-time Analysis":
     st.markdown('<div class="main-header"><h2>📊 Real-time Analysis Dashboard</h2></div>', unsafe_allow_html=True)
     
-    if not st.session_state.cells_data:
+    if not st.session_state.cells_soa["cell_id"]:
         st.warning("No cells configured. Please go to 'Setup Cells' first.")
     else:
         # Control panel
@@ -348,84 +528,64 @@ elif page == "📊 Real-time Analysis":
         
         with col4:
             if st.button("🗑️ Clear History", use_container_width=True):
-                st.session_state.historical_data = []
+                st.session_state.historical_data = empty_history()
                 st.session_state.current_time = 0
         
-        # Auto-refresh when simulation is running
-        if st.session_state.simulation_running:
-            simulate_real_time_data()
-            time.sleep(1)
-            st.rerun()
-        
-        # Real-time metrics
-        st.subheader("📈 Live Metrics")
-        
-        metrics_cols = st.columns(len(st.session_state.cells_data))
-        for idx, (cell_id, cell_data) in enumerate(st.session_state.cells_data.items()):
-            with metrics_cols[idx]:
-                st.metric(
-                    f"{cell_id}",
-                    f"{cell_data['voltage']:.2f}V",
-                    f"{cell_data['temp']:.1f}°C"
-                )
-        
-        # Charts
-        if st.session_state.historical_data:
-            df_hist = pd.DataFrame(st.session_state.historical_data)
-            
-            # Voltage chart
-            fig_voltage = px.line(
-                df_hist, 
-                x='timestamp', 
-                y='voltage', 
-                color='cell_id',
-                title="📊 Cell Voltage Over Time",
-                labels={'voltage': 'Voltage (V)', 'timestamp': 'Time'}
-            )
-            fig_voltage.update_layout(height=400)
-            st.plotly_chart(fig_voltage, use_container_width=True)
+        # Live section reruns on its own timer while the simulation is running
+        @st.fragment(run_every=1 if st.session_state.simulation_running else None)
+        def live_dashboard():
+            if st.session_state.simulation_running:
+                simulate_real_time_data()
             
-            # Temperature and Current charts
-            col5, col6 = st.columns(2)
+            # Real-time metrics
+            st.subheader("📈 Live Metrics")
             
-            with col5:
-                fig_temp = px.line(
-                    df_hist,
-                    x='timestamp',
-                    y='temp',
-                    color='cell_id',
-                    title="🌡️ Temperature Monitoring"
-                )
-                st.plotly_chart(fig_temp, use_container_width=True)
+            soa = st.session_state.cells_soa
+            metrics_cols = st.columns(len(soa["cell_id"]))
+            for idx, cell_id in enumerate(soa["cell_id"]):
+                with metrics_cols[idx]:
+                    st.metric(
+                        f"{cell_id}",
+                        f"{soa['voltage'][idx]:.2f}V",
+                        f"{soa['temp'][idx]:.1f}°C"
+                    )
             
-            with col6:
-                fig_current = px.line(
-                    df_hist,
-                    x='timestamp',
-                    y='current',
-                    color='cell_id',
-                    title="⚡ Current Flow"
-                )
-                st.plotly_chart(fig_current, use_container_width=True)
-        
-        # Task progress
-        if st.session_state.tasks_data:
-            st.subheader("📋 Task Progress")
+            # Charts
+            if st.session_state.historical_data["size"]:
+                history_figs = get_history_figs()
+                
+                # Voltage chart
+                st.plotly_chart(history_figs["voltage"], use_container_width=True)
+                
+                # Temperature and Current charts
+                col5, col6 = st.columns(2)
+                
+                with col5:
+                    st.plotly_chart(history_figs["temp"], use_container_width=True)
+                
+                with col6:
+                    st.plotly_chart(history_figs["current"], use_container_width=True)
             
-            for task_id, task_data in st.session_state.tasks_data.items():
-                if task_data["status"] == "Running":
-                    # Simulate progress
-                    progress = min(100, task_data.get("progress", 0) + random.randint(1, 5))
-                    st.session_state.tasks_data[task_id]["progress"] = progress
-                    
-                    if progress >= 100:
-                        st.session_state.tasks_data[task_id]["status"] = "Completed"
+            # Task progress
+            if st.session_state.tasks_data:
+                st.subheader("📋 Task Progress")
                 
-                col7, col8 = st.columns([3, 1])
-                with col7:
-                    st.progress(task_data.get("progress", 0) / 100, f"{task_id}: {task_data['task_type']}")
-                with col8:
-                    st.write(f"{task_data['status']} ({task_data.get('progress', 0)}%)")
+                for task_id, task_data in st.session_state.tasks_data.items():
+                    if task_data["status"] == "Running":
+                        # Simulate progress
+                        progress = min(100, task_data.get("progress", 0) + random.randint(1, 5))
+                        st.session_state.tasks_data[task_id]["progress"] = progress
+                        
+                        if progress >= 100:
+                            st.session_state.tasks_data[task_id]["status"] = "Completed"
+                    
+                    col7, col8 = st.columns([3, 1])
+                    with col7:
+                        st.progress(task_data.get("progress", 0) / 100, f"{task_id}: {task_data['task_type']}")
+                    with col8:
+                        st.write(f"{task_data['status']} ({task_data.get('progress', 0)}%)")
+        
+        live_dashboard()
 
 # Page 5: Data Export
 elif page == "📥 Data Export":
@@ -436,12 +596,12 @@ elif page == "📥 Data Export":
     with col1:
         st.subheader("📊 Cell Data Summary")
         
-        if st.session_state.cells_data:
-            df_cells = pd.DataFrame.from_dict(st.session_state.cells_data, orient='index')
-            st.dataframe(df_cells, use_container_width=True)
+        if st.session_state.cells_soa["cell_id"]:
+            df_cells = get_cells_df()
+            st.dataframe(df_cells, use_container_width=True, column_config=value_column_config())
             
             # Export cell data
-            csv_cells = df_cells.to_csv(index=True)
+            csv_cells = to_csv_bytes(df_cells)
             st.download_button(
                 label="📥 Download Cell Data (CSV)",
                 data=csv_cells,
@@ -460,7 +620,7 @@ elif page == "📥 Data Export":
             st.dataframe(df_tasks, use_container_width=True)
             
             # Export task data
-            csv_tasks = df_tasks.to_csv(index=True)
+            csv_tasks = to_csv_bytes(df_tasks)
             st.download_button(
                 label="📥 Download Task Data (CSV)",
                 data=csv_tasks,
@@ -472,13 +632,24 @@ elif page == "📥 Data Export":
             st.info("No task data available for export.")
     
     # Historical data export
-    if st.session_state.historical_data:
+    if st.session_state.historical_data["size"]:
         st.subheader("📈 Historical Data")
         
-        df_historical = pd.DataFrame(st.session_state.historical_data)
-        st.dataframe(df_historical.tail(100), use_container_width=True)  # Show last 100 records
+        df_historical = get_history_df()
+        # Show last 100 records
+        st.dataframe(
+            df_historical.tail(100), use_container_width=True, column_config=value_column_config()
+        )
+        
+        st.download_button(
+            label="📥 Download Historical Data (Parquet)",
+            data=to_parquet_bytes(df_historical),
+            file_name=f"battery_historical_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet",
+            mime="application/octet-stream",
+            use_container_width=True
+        )
         
-        csv_historical = df_historical.to_csv(index=False)
+        csv_historical = to_csv_bytes(df_historical, index=False)
         st.download_button(
             label="📥 Download Historical Data (CSV)",
             data=csv_historical,